@@ -1,12 +1,26 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import asyncio
+import brotli
+import gzip
+import hashlib
+import json
 import sys
-import io
 import os
+import tempfile
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+
+from convert_to_parquet import MIXED_COLUMNS_KEY
 
 BASE_DIR = Path(__file__).parent
 
@@ -35,7 +49,68 @@ MONTH_NAMES = {
 
 FINANCIAL_YEAR_ORDER = ["Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec", "Jan", "Feb", "Mar"]
 
-app = FastAPI(title=APP_NAME)
+# Month number -> index into FINANCIAL_YEAR_ORDER; 0 stands in for a missing date
+MONTH_LOOKUP = np.full(13, -1, dtype=np.int8)
+for number, name in MONTH_NAMES.items():
+    MONTH_LOOKUP[number] = FINANCIAL_YEAR_ORDER.index(name)
+
+DIVISION_MAPPING = {
+    "A": "HO", "B": "AMT", "C": "CITY", "D": "YAT", "G": "WAG",
+    "L": "SHI", "M": "CHA", "R": "KOL", "U": "CHI"
+}
+
+DIVISION_LABELS = sorted(set(DIVISION_MAPPING.values()) | {"Unknown"})
+
+# Byte value -> index into DIVISION_LABELS, for both letter cases
+DIVISION_LOOKUP = np.full(256, DIVISION_LABELS.index("Unknown"), dtype=np.int8)
+for letter, division in DIVISION_MAPPING.items():
+    DIVISION_LOOKUP[ord(letter)] = DIVISION_LOOKUP[ord(letter.lower())] = DIVISION_LABELS.index(division)
+
+# Per-row values derived once at load time; excluded from the "Complete Details" exports
+DERIVED_COLUMNS = ["_division", "_month", "_mrp_value"]
+
+LABOUR_COLUMNS = [
+    "RO No.", "RO Date", "RO Status", "Registration No", "Chassis No.", "Vehicle Model",
+    "Sale Date", "Customer Name", "Kilometer", "Service Advisor", "Service Type",
+    "Sublet Code", "Labour in/Out", "Sublet Amount", "Labour Code", "Labour Description",
+    "STD Hours", "Techncn Name 1", "Techncn Name 2", "Techncn Name 3",
+    "Labour Basic Amount", "Discount Amount", "Labour Basic Amount-DIS",
+    "Tax Amount", "Labour Total Amount", "Billable Type", "Bill Date"
+]
+
+LABOUR_DTYPES = {
+    "RO No.": "string[pyarrow]",
+    "Labour Description": "category",
+    "Labour Basic Amount-DIS": "float64",
+    "Labour Total Amount": "float64",
+}
+
+SPARES_DTYPES = {
+    "RO Number": "string[pyarrow]",
+    "Part Desc": "category",
+    "Final Qty": "float64",
+    "NDP PRIC*Qty": "float64",
+    "Selling Price/Landed Cost (Total of Issued Qty)": "float64",
+    "MRP (Per Qty)": "float64",
+}
+
+
+class GZipExceptExportsMiddleware(GZipMiddleware):
+    # Excel exports are already zip archives, so gzipping them again only burns CPU.
+    # The base class only looks for "gzip" in Accept-Encoding, so an explicit gzip;q=0 is honoured here.
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (
+            scope["path"].endswith("/export")
+            or accepted_encodings(Headers(scope=scope).get("accept-encoding", "")).get("gzip") == 0
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app = FastAPI(title=APP_NAME, default_response_class=ORJSONResponse)
+
+app.add_middleware(GZipExceptExportsMiddleware, minimum_size=1024)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,12 +121,103 @@ app.add_middleware(
 )
 
 
+def get_division_series(ro_series):
+    # Fifth byte of every RO number, looked up in DIVISION_LOOKUP without touching Python per row
+    try:
+        ro_bytes = ro_series.to_numpy(dtype="S5", na_value="")
+    except UnicodeEncodeError:
+        ro_bytes = ro_series.astype(str).str.encode("ascii", "replace").to_numpy(dtype="S5")
+    codes = DIVISION_LOOKUP[ro_bytes.view(np.uint8).reshape(-1, 5)[:, 4]]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=DIVISION_LABELS), index=ro_series.index)
+
+
+def get_month_series(date_series):
+    # Ordered in financial-year order, so sorting by month needs no lookup
+    months = pd.to_datetime(date_series, errors="coerce").dt.month.fillna(0).to_numpy(dtype=np.int8)
+    months = pd.Categorical.from_codes(MONTH_LOOKUP[months], categories=FINANCIAL_YEAR_ORDER, ordered=True)
+    return pd.Series(months, index=date_series.index)
+
+
+def use_arrow_strings(df):
+    # Only all-text columns; mixed number/text columns stay object so numbers export as numbers
+    for c in df.select_dtypes("object").columns:
+        if pd.api.types.infer_dtype(df[c], skipna=True) == "string":
+            df[c] = df[c].astype("string[pyarrow]")
+    return df
+
+
+def normalize_advisors(df):
+    if "Service Advisor" in df.columns:
+        advisors = df["Service Advisor"].astype("string").str.strip().replace("", pd.NA)
+        df["Service Advisor"] = advisors.astype("category")
+    return df
+
+
+def add_spares_mrp_value(df):
+    qty_col = "Final Qty"
+    ndp_col = "NDP PRIC*Qty"
+    sell_col = "Selling Price/Landed Cost (Total of Issued Qty)"
+    mrp_col = "MRP (Per Qty)"
+
+    for c in (qty_col, ndp_col, sell_col, mrp_col):
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    if qty_col in df.columns and mrp_col in df.columns:
+        df["_mrp_value"] = (df[qty_col] * df[mrp_col]).fillna(0.0)
+    else:
+        df["_mrp_value"] = 0.0
+    return df
+
+
+def add_derived_columns(df, ro_col, date_col):
+    if ro_col in df.columns:
+        df["_division"] = get_division_series(df[ro_col])
+    if date_col in df.columns:
+        df["_month"] = get_month_series(df[date_col])
+    return df
+
+
+def restore_mixed_columns(df, table):
+    # The converter split each mixed number/text column into text, integer and float columns;
+    # merge them back cell by cell
+    mixed_columns = json.loads((table.schema.metadata or {}).get(MIXED_COLUMNS_KEY, b"{}"))
+    for c, spec in mixed_columns.items():
+        values = df[c].astype(object).where(df[c].notna(), np.nan).to_numpy()
+        for kind, dtype in (("integers", "int64"), ("floats", "float64")):
+            numbers = df.pop(spec[kind])
+            present = numbers.notna().to_numpy()
+            values[present] = numbers[present].astype(dtype).tolist()
+        df[c] = pd.Series(values, index=df.index, dtype=object)
+    return df
+
+
+def read_source(path, dtype, usecols=None):
+    suffix = path.suffix.lower()
+    if suffix in (".parquet", ".arrow"):
+        if suffix == ".arrow":
+            # Memory-mapped, so every worker process shares the file's pages instead of a private copy
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            table = pq.read_table(path)
+            df = table.to_pandas()
+        restore_mixed_columns(df, table)
+        if usecols is not None:
+            df = df[[c for c in df.columns if usecols(c)]]
+        return df.astype({c: t for c, t in dtype.items() if c in df.columns})
+    return pd.read_excel(path, engine="calamine", usecols=usecols, dtype=dtype)
+
+
 def load_data():
     try:
         print(f"Loading Labour file: {LABOUR_FILE}")
         if LABOUR_FILE.exists():
-            labour_df_local = pd.read_excel(LABOUR_FILE, engine='openpyxl')
+            labour_df_local = read_source(LABOUR_FILE, LABOUR_DTYPES, usecols=lambda c: c in LABOUR_COLUMNS)
             labour_df_local["Bill Date"] = pd.to_datetime(labour_df_local.get("Bill Date"), errors="coerce")
+            use_arrow_strings(labour_df_local)
+            normalize_advisors(labour_df_local)
+            add_derived_columns(labour_df_local, "RO No.", "Bill Date")
             print(f"   Loaded {len(labour_df_local)} labour records")
         else:
             print("   Labour file not found. Running with empty labour data.")
@@ -59,8 +225,12 @@ def load_data():
 
         print(f"Loading Spares file: {SPARES_FILE}")
         if SPARES_FILE.exists():
-            spares_df_local = pd.read_excel(SPARES_FILE, engine='openpyxl')
+            spares_df_local = read_source(SPARES_FILE, SPARES_DTYPES)
             spares_df_local["Doc Date"] = pd.to_datetime(spares_df_local.get("Doc Date"), errors="coerce")
+            use_arrow_strings(spares_df_local)
+            normalize_advisors(spares_df_local)
+            add_derived_columns(spares_df_local, "RO Number", "Doc Date")
+            add_spares_mrp_value(spares_df_local)
             print(f"   Loaded {len(spares_df_local)} spares records")
         else:
             print("   Spares file not found. Running with empty spares data.")
@@ -76,181 +246,147 @@ def load_data():
 
 labour_df, spares_df = load_data()
 
-DIVISION_MAPPING = {
-    "A": "HO", "B": "AMT", "C": "CITY", "D": "YAT", "G": "WAG",
-    "L": "SHI", "M": "CHA", "R": "KOL", "U": "CHI"
-}
 
+def build_summary_cube(df, values):
+    keys = [df[c] for c in ("_division", "_month", "Service Advisor") if c in df.columns]
+    if df.empty or not keys:
+        return None
+    # Only ever filtered and summed, so group order is irrelevant
+    grouped = pd.DataFrame(values, index=df.index).groupby(keys, observed=True, sort=False, dropna=False)
+    cube = grouped.sum()
+    cube["_rows"] = grouped.size()
+    return cube
 
-def get_division_from_ro(ro_no):
-    try:
-        s = str(ro_no)
-        if len(s) >= 5:
-            letter = s[4].upper()
-            return DIVISION_MAPPING.get(letter, "Unknown")
-    except Exception:
-        pass
-    return "Unknown"
 
+def build_labour_summary_cube(df):
+    dis_col = "Labour Basic Amount-DIS"
+    tot_col = "Labour Total Amount"
+    return build_summary_cube(df, {c: df[c] for c in (dis_col, tot_col) if c in df.columns})
+
+
+def build_spares_summary_cube(df):
+    ndp_col = "NDP PRIC*Qty"
+    sell_col = "Selling Price/Landed Cost (Total of Issued Qty)"
+    return build_summary_cube(df, {c: df[c] for c in (ndp_col, sell_col, "_mrp_value") if c in df.columns})
 
-def get_month_name(date):
-    try:
-        if pd.notna(date):
-            return MONTH_NAMES.get(date.month, "")
-    except Exception:
-        pass
-    return ""
 
+def select_from_cube(cube, division=None, month=None, advisor=None):
+    for level, value in (("_division", division), ("_month", month), ("Service Advisor", advisor)):
+        if value and level in cube.index.names:
+            cube = cube[cube.index.get_level_values(level) == value]
+    return cube
 
+
+def filter_rows(df, division=None, month=None, advisor=None):
+    # All filters ANDed into one mask so the frame is sliced once
+    mask = None
+    for col, value in (("_division", division), ("_month", month), ("Service Advisor", advisor)):
+        if value and col in df.columns:
+            matches = (df[col] == value).to_numpy()
+            mask = matches if mask is None else mask & matches
+    return df if mask is None else df[mask]
+
+
+# Division x month x advisor totals; the frames are loaded once, so these never go stale
+LABOUR_SUMMARY_CUBE = build_labour_summary_cube(labour_df)
+SPARES_SUMMARY_CUBE = build_spares_summary_cube(spares_df)
+
+# "Complete Details" columns actually present in each file, resolved once after load
+LABOUR_EXPORT_COLUMNS = tuple(c for c in LABOUR_COLUMNS if c in labour_df.columns)
+SPARES_EXPORT_COLUMNS = tuple(c for c in spares_df.columns if c not in DERIVED_COLUMNS)
+
+
+# Dropdown lists are pure functions of the frames, which are loaded once; bounded because
+# division/month come straight from the request.
+DROPDOWN_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_labour_divisions():
-    if labour_df.empty or "RO No." not in labour_df.columns:
+    if labour_df.empty or "_division" not in labour_df.columns:
         return []
-    divisions = set()
-    for ro_no in labour_df["RO No."].dropna().unique():
-        div = get_division_from_ro(str(ro_no))
-        if div != "Unknown":
-            divisions.add(div)
-    return sorted(list(divisions))
+    divisions = set(labour_df["_division"].unique()) - {"Unknown"}
+    return sorted(divisions)
 
 
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_spares_divisions():
-    if spares_df.empty or "RO Number" not in spares_df.columns:
+    if spares_df.empty or "_division" not in spares_df.columns:
         return []
-    divisions = set()
-    for ro_no in spares_df["RO Number"].dropna().unique():
-        div = get_division_from_ro(str(ro_no))
-        if div != "Unknown":
-            divisions.add(div)
-    return sorted(list(divisions))
+    divisions = set(spares_df["_division"].unique()) - {"Unknown"}
+    return sorted(divisions)
 
 
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_labour_months_for_division(division):
-    if labour_df.empty or "RO No." not in labour_df.columns or "Bill Date" not in labour_df.columns:
+    if labour_df.empty or "_division" not in labour_df.columns or "_month" not in labour_df.columns:
         return []
-    if not division:
-        months = set()
-        for d in labour_df["Bill Date"].dropna().unique():
-            m = get_month_name(d)
-            if m:
-                months.add(m)
-        return [m for m in FINANCIAL_YEAR_ORDER if m in months]
-
-    filtered = labour_df[labour_df["RO No."].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    months = set()
-    for date in filtered["Bill Date"].dropna().unique():
-        month = get_month_name(date)
-        if month:
-            months.add(month)
-    return [m for m in FINANCIAL_YEAR_ORDER if m in months]
+    filtered = filter_rows(labour_df, division)
+    return filtered["_month"].dropna().unique().sort_values().tolist()
 
 
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_spares_months_for_division(division):
-    if spares_df.empty or "RO Number" not in spares_df.columns or "Doc Date" not in spares_df.columns:
+    if spares_df.empty or "_division" not in spares_df.columns or "_month" not in spares_df.columns:
         return []
-    if not division:
-        months = set()
-        for d in spares_df["Doc Date"].dropna().unique():
-            m = get_month_name(d)
-            if m:
-                months.add(m)
-        return [m for m in FINANCIAL_YEAR_ORDER if m in months]
-
-    filtered = spares_df[spares_df["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    months = set()
-    for date in filtered["Doc Date"].dropna().unique():
-        month = get_month_name(date)
-        if month:
-            months.add(month)
-    return [m for m in FINANCIAL_YEAR_ORDER if m in months]
+    filtered = filter_rows(spares_df, division)
+    return filtered["_month"].dropna().unique().sort_values().tolist()
 
 
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_labour_advisors_any(division=None, month=None):
     if labour_df.empty or "Service Advisor" not in labour_df.columns:
         return []
-    filtered = labour_df.copy()
-
-    if division and "RO No." in filtered.columns:
-        filtered = filtered[filtered["RO No."].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Bill Date" in filtered.columns:
-        filtered = filtered[filtered["Bill Date"].apply(lambda x: get_month_name(x) == month)]
-
-    advisors = filtered["Service Advisor"].dropna().unique().tolist()
-    advisors = [str(a).strip() for a in advisors if str(a).strip()]
-    return sorted(list(set(advisors)))
+    filtered = filter_rows(labour_df, division, month)
+    return sorted(filtered["Service Advisor"].dropna().unique().tolist())
 
 
+@lru_cache(maxsize=DROPDOWN_CACHE_SIZE)
 def get_spares_advisors_any(division=None, month=None):
     if spares_df.empty or "Service Advisor" not in spares_df.columns:
         return []
-    filtered = spares_df.copy()
-
-    if division and "RO Number" in filtered.columns:
-        filtered = filtered[filtered["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Doc Date" in filtered.columns:
-        filtered = filtered[filtered["Doc Date"].apply(lambda x: get_month_name(x) == month)]
-
-    advisors = filtered["Service Advisor"].dropna().unique().tolist()
-    advisors = [str(a).strip() for a in advisors if str(a).strip()]
-    return sorted(list(set(advisors)))
+    filtered = filter_rows(spares_df, division, month)
+    return sorted(filtered["Service Advisor"].dropna().unique().tolist())
 
 
 def get_labour_summary(division=None, month=None, advisor=None):
-    if labour_df.empty:
+    if labour_df.empty or LABOUR_SUMMARY_CUBE is None:
         return {"total_items": 0, "total_dis": 0, "total_amount": 0}
 
-    filtered = labour_df.copy()
-
-    if division and "RO No." in filtered.columns:
-        filtered = filtered[filtered["RO No."].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Bill Date" in filtered.columns:
-        filtered = filtered[filtered["Bill Date"].apply(lambda x: get_month_name(x) == month)]
-    if advisor and "Service Advisor" in filtered.columns:
-        filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
+    selected = select_from_cube(LABOUR_SUMMARY_CUBE, division, month, advisor)
 
-    if filtered.empty:
+    total_items = int(selected["_rows"].sum())
+    if total_items == 0:
         return {"total_items": 0, "total_dis": 0, "total_amount": 0}
 
     dis_col = "Labour Basic Amount-DIS"
     tot_col = "Labour Total Amount"
 
-    total_dis = float(filtered[dis_col].sum()) if dis_col in filtered.columns else 0.0
-    total_amount = float(filtered[tot_col].sum()) if tot_col in filtered.columns else 0.0
+    total_dis = float(selected[dis_col].sum()) if dis_col in selected.columns else 0.0
+    total_amount = float(selected[tot_col].sum()) if tot_col in selected.columns else 0.0
 
     return {
-        "total_items": int(len(filtered)),
+        "total_items": total_items,
         "total_dis": total_dis,
         "total_amount": total_amount
     }
 
 
 def get_spares_summary(division=None, month=None, advisor=None):
-    if spares_df.empty:
+    if spares_df.empty or SPARES_SUMMARY_CUBE is None:
         return {"total_ndp": 0, "total_selling": 0, "total_mrp": 0}
 
-    filtered = spares_df.copy()
-
-    if division and "RO Number" in filtered.columns:
-        filtered = filtered[filtered["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Doc Date" in filtered.columns:
-        filtered = filtered[filtered["Doc Date"].apply(lambda x: get_month_name(x) == month)]
-    if advisor and "Service Advisor" in filtered.columns:
-        filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
+    selected = select_from_cube(SPARES_SUMMARY_CUBE, division, month, advisor)
 
-    if filtered.empty:
+    if int(selected["_rows"].sum()) == 0:
         return {"total_ndp": 0, "total_selling": 0, "total_mrp": 0}
 
     ndp_col = "NDP PRIC*Qty"
     sell_col = "Selling Price/Landed Cost (Total of Issued Qty)"
-    qty_col = "Final Qty"
-    mrp_col = "MRP (Per Qty)"
-
-    total_ndp = float(filtered[ndp_col].sum()) if ndp_col in filtered.columns else 0.0
-    total_selling = float(filtered[sell_col].sum()) if sell_col in filtered.columns else 0.0
 
-    if qty_col in filtered.columns and mrp_col in filtered.columns:
-        total_mrp = float((filtered[qty_col] * filtered[mrp_col]).sum())
-    else:
-        total_mrp = 0.0
+    total_ndp = float(selected[ndp_col].sum()) if ndp_col in selected.columns else 0.0
+    total_selling = float(selected[sell_col].sum()) if sell_col in selected.columns else 0.0
+    total_mrp = float(selected["_mrp_value"].sum()) if "_mrp_value" in selected.columns else 0.0
 
     return {
         "total_ndp": total_ndp,
@@ -263,14 +399,7 @@ def get_labour_data(division=None, month=None, advisor=None):
     if labour_df.empty:
         return []
 
-    filtered = labour_df.copy()
-
-    if division and "RO No." in filtered.columns:
-        filtered = filtered[filtered["RO No."].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Bill Date" in filtered.columns:
-        filtered = filtered[filtered["Bill Date"].apply(lambda x: get_month_name(x) == month)]
-    if advisor and "Service Advisor" in filtered.columns:
-        filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
+    filtered = filter_rows(labour_df, division, month, advisor)
 
     if filtered.empty:
         return []
@@ -290,10 +419,10 @@ def get_labour_data(division=None, month=None, advisor=None):
         if "RO No." in filtered.columns:
             agg_map["RO No."] = "count"
         else:
-            filtered["_rowcount_"] = 1
+            filtered = filtered.assign(_rowcount_=1)
             agg_map["_rowcount_"] = "sum"
 
-        grouped = filtered.groupby("Labour Description", as_index=False).agg(agg_map)
+        grouped = filtered.groupby("Labour Description", as_index=False, observed=True).agg(agg_map)
 
         if "RO No." in grouped.columns:
             grouped = grouped.rename(columns={"RO No.": "count"})
@@ -305,15 +434,13 @@ def get_labour_data(division=None, month=None, advisor=None):
         if tot_col not in grouped.columns:
             grouped[tot_col] = 0.0
 
-        result = []
-        for _, row in grouped.iterrows():
-            result.append({
-                "Labour Description": str(row["Labour Description"]),
-                "count": int(row["count"]),
-                "Labour Basic Amount-DIS": float(row[dis_col]),
-                "Labour Total Amount": float(row[tot_col])
-            })
-        return result
+        grouped = grouped[["Labour Description", "count", dis_col, tot_col]].astype({
+            "Labour Description": str,
+            "count": "int64",
+            dis_col: "float64",
+            tot_col: "float64"
+        })
+        return grouped.to_dict("records")
     except Exception as e:
         print(f"Error processing labour data: {e}")
         return []
@@ -323,14 +450,7 @@ def get_spares_data(division=None, month=None, advisor=None):
     if spares_df.empty:
         return []
 
-    filtered = spares_df.copy()
-
-    if division and "RO Number" in filtered.columns:
-        filtered = filtered[filtered["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == division)]
-    if month and "Doc Date" in filtered.columns:
-        filtered = filtered[filtered["Doc Date"].apply(lambda x: get_month_name(x) == month)]
-    if advisor and "Service Advisor" in filtered.columns:
-        filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
+    filtered = filter_rows(spares_df, division, month, advisor)
 
     if filtered.empty:
         return []
@@ -342,7 +462,6 @@ def get_spares_data(division=None, month=None, advisor=None):
         qty_col = "Final Qty"
         ndp_col = "NDP PRIC*Qty"
         sell_col = "Selling Price/Landed Cost (Total of Issued Qty)"
-        mrp_col = "MRP (Per Qty)"
 
         agg_map = {}
         if qty_col in filtered.columns:
@@ -351,10 +470,10 @@ def get_spares_data(division=None, month=None, advisor=None):
             agg_map[ndp_col] = "sum"
         if sell_col in filtered.columns:
             agg_map[sell_col] = "sum"
-        if mrp_col in filtered.columns:
-            agg_map[mrp_col] = "mean"
+        if "_mrp_value" in filtered.columns:
+            agg_map["_mrp_value"] = "sum"
 
-        grouped = filtered.groupby("Part Desc", as_index=False).agg(agg_map)
+        grouped = filtered.groupby("Part Desc", as_index=False, observed=True).agg(agg_map)
 
         if qty_col not in grouped.columns:
             grouped[qty_col] = 0.0
@@ -362,75 +481,111 @@ def get_spares_data(division=None, month=None, advisor=None):
             grouped[ndp_col] = 0.0
         if sell_col not in grouped.columns:
             grouped[sell_col] = 0.0
-        if mrp_col not in grouped.columns:
-            grouped[mrp_col] = 0.0
-
-        grouped["MRP_Total"] = grouped[qty_col] * grouped[mrp_col]
-
-        result = []
-        for _, row in grouped.iterrows():
-            result.append({
-                "part_desc": str(row["Part Desc"]),
-                "final_qty": float(row[qty_col]),
-                "ndp_price_qty": float(row[ndp_col]),
-                "selling_price_total": float(row[sell_col]),
-                "mrp_total": float(row["MRP_Total"])
-            })
-        return result
+        if "_mrp_value" not in grouped.columns:
+            grouped["_mrp_value"] = 0.0
+
+        grouped = grouped.rename(columns={
+            "Part Desc": "part_desc",
+            qty_col: "final_qty",
+            ndp_col: "ndp_price_qty",
+            sell_col: "selling_price_total",
+            "_mrp_value": "mrp_total"
+        })
+        grouped = grouped[["part_desc", "final_qty", "ndp_price_qty", "selling_price_total", "mrp_total"]].astype({
+            "part_desc": str,
+            "final_qty": "float64",
+            "ndp_price_qty": "float64",
+            "selling_price_total": "float64",
+            "mrp_total": "float64"
+        })
+        return grouped.to_dict("records")
     except Exception as e:
         print(f"Error processing spares data: {e}")
         return []
 
 
+def excel_file_response(report_name, sheets):
+    # Written to a temp file and streamed from disk so the workbook is never held in memory as bytes.
+    # xlsxwriter's constant_memory mode is not used: pandas writes cells column by column, which it drops.
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+    except Exception:
+        os.remove(path)
+        raise
+
+    filename = f"{report_name}_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(os.remove, path)
+    )
+
+
+def append_grand_total(summary_df, label_col):
+    if summary_df.empty:
+        return summary_df
+    totals = {c: summary_df[c].sum() for c in summary_df.columns if c != label_col}
+    totals[label_col] = "Grand Total"
+    return pd.concat([summary_df, pd.DataFrame([totals])], ignore_index=True)
+
+
 # -------------------- APIs --------------------
+# Dropdown endpoints only touch cached columns and run on the event loop; summary/data stay
+# in the threadpool, and exports use asyncio.to_thread so they never hold up either.
+# Data rows are already plain Python values, so they go straight to orjson without jsonable_encoder.
 
 @app.get("/api/labour/divisions")
-def api_labour_divisions():
+async def api_labour_divisions():
     return {"divisions": get_labour_divisions()}
 
 
 @app.get("/api/spares/divisions")
-def api_spares_divisions():
+async def api_spares_divisions():
     return {"divisions": get_spares_divisions()}
 
 
 @app.get("/api/labour/months")
-def api_labour_months_all():
+async def api_labour_months_all():
     return {"months": get_labour_months_for_division(None)}
 
 
 @app.get("/api/labour/months/{division}")
-def api_labour_months_div(division: str):
+async def api_labour_months_div(division: str):
     return {"months": get_labour_months_for_division(division)}
 
 
 @app.get("/api/spares/months")
-def api_spares_months_all():
+async def api_spares_months_all():
     return {"months": get_spares_months_for_division(None)}
 
 
 @app.get("/api/spares/months/{division}")
-def api_spares_months_div(division: str):
+async def api_spares_months_div(division: str):
     return {"months": get_spares_months_for_division(division)}
 
 
 @app.get("/api/labour/advisors")
-def api_labour_advisors(division: str = None, month: str = None):
+async def api_labour_advisors(division: str = None, month: str = None):
     return {"advisors": get_labour_advisors_any(division, month)}
 
 
 @app.get("/api/labour/advisors/{division}/{month}")
-def api_labour_advisors_old(division: str, month: str):
+async def api_labour_advisors_old(division: str, month: str):
     return {"advisors": get_labour_advisors_any(division, month)}
 
 
 @app.get("/api/spares/advisors")
-def api_spares_advisors(division: str = None, month: str = None):
+async def api_spares_advisors(division: str = None, month: str = None):
     return {"advisors": get_spares_advisors_any(division, month)}
 
 
 @app.get("/api/spares/advisors/{division}/{month}")
-def api_spares_advisors_old(division: str, month: str):
+async def api_spares_advisors_old(division: str, month: str):
     return {"advisors": get_spares_advisors_any(division, month)}
 
 
@@ -442,7 +597,7 @@ def api_labour_summary(division: str = None, month: str = None, advisor: str = N
 @app.get("/api/labour/data")
 def api_labour_data(division: str = None, month: str = None, advisor: str = None):
     data = get_labour_data(division if division else None, month if month else None, advisor if advisor else None)
-    return {"rows": data}
+    return ORJSONResponse({"rows": data})
 
 
 @app.get("/api/spares/summary")
@@ -453,109 +608,45 @@ def api_spares_summary(division: str = None, month: str = None, advisor: str = N
 @app.get("/api/spares/data")
 def api_spares_data(division: str = None, month: str = None, advisor: str = None):
     data = get_spares_data(division if division else None, month if month else None, advisor if advisor else None)
-    return {"rows": data}
+    return ORJSONResponse({"rows": data})
 
 
-@app.get("/api/labour/export")
-def export_labour_data(division: str = None, month: str = None, advisor: str = None):
+def build_labour_export(division=None, month=None, advisor=None):
     try:
-        filtered = labour_df.copy()
-
-        if not filtered.empty:
-            if division and "RO No." in filtered.columns:
-                filtered = filtered[filtered["RO No."].apply(lambda x: get_division_from_ro(str(x)) == division)]
-            if month and "Bill Date" in filtered.columns:
-                filtered = filtered[filtered["Bill Date"].apply(lambda x: get_month_name(x) == month)]
-            if advisor and "Service Advisor" in filtered.columns:
-                filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
+        filtered = filter_rows(labour_df, division, month, advisor)
 
         if filtered.empty:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                pd.DataFrame().to_excel(writer, sheet_name="Complete Details", index=False)
-                pd.DataFrame().to_excel(writer, sheet_name="Month-wise Summary", index=False)
-                pd.DataFrame().to_excel(writer, sheet_name="Division Summary", index=False)
-                pd.DataFrame().to_excel(writer, sheet_name="Labour Description", index=False)
-            output.seek(0)
-
-            filename = f"Labour_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            return StreamingResponse(
-                iter([output.getvalue()]),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-
-        required_cols = [
-            "RO No.", "RO Date", "RO Status", "Registration No", "Chassis No.", "Vehicle Model",
-            "Sale Date", "Customer Name", "Kilometer", "Service Advisor", "Service Type",
-            "Sublet Code", "Labour in/Out", "Sublet Amount", "Labour Code", "Labour Description",
-            "STD Hours", "Techncn Name 1", "Techncn Name 2", "Techncn Name 3",
-            "Labour Basic Amount", "Discount Amount", "Labour Basic Amount-DIS",
-            "Tax Amount", "Labour Total Amount", "Billable Type", "Bill Date"
-        ]
-        present_cols = [c for c in required_cols if c in filtered.columns]
-        details_df = filtered[present_cols].copy() if present_cols else filtered.copy()
-
-        month_summary = []
-        total_count = 0
-        total_without_tax = 0.0
-        total_with_tax = 0.0
+            return excel_file_response("Labour", {
+                "Complete Details": pd.DataFrame(),
+                "Month-wise Summary": pd.DataFrame(),
+                "Division Summary": pd.DataFrame(),
+                "Labour Description": pd.DataFrame()
+            })
+
+        details_df = filtered.reindex(columns=LABOUR_EXPORT_COLUMNS, copy=False) if LABOUR_EXPORT_COLUMNS else filtered
 
         dis_col = "Labour Basic Amount-DIS"
         tot_col = "Labour Total Amount"
 
-        for m in FINANCIAL_YEAR_ORDER:
-            if "Bill Date" not in filtered.columns:
-                break
-            m_filtered = filtered[filtered["Bill Date"].apply(lambda x: get_month_name(x) == m)]
-            if not m_filtered.empty:
-                count = int(len(m_filtered))
-                without_tax = float(m_filtered[dis_col].sum()) if dis_col in m_filtered.columns else 0.0
-                with_tax = float(m_filtered[tot_col].sum()) if tot_col in m_filtered.columns else 0.0
-
-                month_summary.append({"Month": m, "Count": count, "Without Tax": without_tax, "With Tax": with_tax})
-                total_count += count
-                total_without_tax += without_tax
-                total_with_tax += with_tax
-
-        if month_summary:
-            month_summary.append({
-                "Month": "Grand Total",
-                "Count": total_count,
-                "Without Tax": total_without_tax,
-                "With Tax": total_with_tax
-            })
-
-        month_summary_df = pd.DataFrame(month_summary)
-
-        div_summary = []
-        total_div_count = 0
-        total_div_without_tax = 0.0
-        total_div_with_tax = 0.0
-
-        for div in get_labour_divisions():
-            df_div = labour_df.copy()
-            if not df_div.empty and "RO No." in df_div.columns:
-                df_div = df_div[df_div["RO No."].apply(lambda x: get_division_from_ro(str(x)) == div)]
-
-            count = int(len(df_div))
-            without_tax = float(df_div[dis_col].sum()) if (not df_div.empty and dis_col in df_div.columns) else 0.0
-            with_tax = float(df_div[tot_col].sum()) if (not df_div.empty and tot_col in df_div.columns) else 0.0
-
-            div_summary.append({"Division": div, "Count": count, "Without Tax": without_tax, "With Tax": with_tax})
-            total_div_count += count
-            total_div_without_tax += without_tax
-            total_div_with_tax += with_tax
-
-        if div_summary:
-            div_summary.append({
-                "Division": "Grand Total",
-                "Count": total_div_count,
-                "Without Tax": total_div_without_tax,
-                "With Tax": total_div_with_tax
+        month_summary_df = pd.DataFrame()
+        if "_month" in filtered.columns:
+            by_month = filtered.groupby("_month", observed=True)
+            month_summary_df = pd.DataFrame({
+                "Count": by_month.size(),
+                "Without Tax": by_month[dis_col].sum() if dis_col in filtered.columns else 0.0,
+                "With Tax": by_month[tot_col].sum() if tot_col in filtered.columns else 0.0
             })
-
-        div_summary_df = pd.DataFrame(div_summary)
+            month_summary_df = append_grand_total(month_summary_df.rename_axis("Month").reset_index(), "Month")
+
+        div_summary_df = pd.DataFrame()
+        if "_division" in labour_df.columns:
+            by_division = labour_df.groupby("_division", observed=True)
+            div_summary_df = pd.DataFrame({
+                "Count": by_division.size(),
+                "Without Tax": by_division[dis_col].sum() if dis_col in labour_df.columns else 0.0,
+                "With Tax": by_division[tot_col].sum() if tot_col in labour_df.columns else 0.0
+            }).drop(index="Unknown", errors="ignore")
+            div_summary_df = append_grand_total(div_summary_df.rename_axis("Division").reset_index(), "Division")
 
         labour_desc_df = pd.DataFrame()
         if "Labour Description" in filtered.columns:
@@ -564,7 +655,7 @@ def export_labour_data(division: str = None, month: str = None, advisor: str = N
             if "RO No." in filtered.columns:
                 agg_map["RO No."] = "count"
             else:
-                filtered["_rowcount_"] = 1
+                filtered = filtered.assign(_rowcount_=1)
                 agg_map["_rowcount_"] = "sum"
 
             if dis_col in filtered.columns:
@@ -573,7 +664,7 @@ def export_labour_data(division: str = None, month: str = None, advisor: str = N
                 agg_map[tot_col] = "sum"
 
             if agg_map:
-                g = filtered.groupby("Labour Description", as_index=False).agg(agg_map)
+                g = filtered.groupby("Labour Description", as_index=False, observed=True).agg(agg_map)
 
                 if "RO No." in g.columns:
                     g = g.rename(columns={"RO No.": "Count"})
@@ -592,23 +683,14 @@ def export_labour_data(division: str = None, month: str = None, advisor: str = N
                 else:
                     g["With Tax"] = 0.0
 
-                labour_desc_df = g[["Labour Description", "Count", "Without Tax", "With Tax"]].copy()
-
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            details_df.to_excel(writer, sheet_name="Complete Details", index=False)
-            month_summary_df.to_excel(writer, sheet_name="Month-wise Summary", index=False)
-            div_summary_df.to_excel(writer, sheet_name="Division Summary", index=False)
-            labour_desc_df.to_excel(writer, sheet_name="Labour Description", index=False)
+                labour_desc_df = g[["Labour Description", "Count", "Without Tax", "With Tax"]]
 
-        output.seek(0)
-        filename = f"Labour_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return excel_file_response("Labour", {
+            "Complete Details": details_df,
+            "Month-wise Summary": month_summary_df,
+            "Division Summary": div_summary_df,
+            "Labour Description": labour_desc_df
+        })
     except Exception as e:
         print(f"Error exporting labour data: {e}")
         import traceback
@@ -616,149 +698,66 @@ def export_labour_data(division: str = None, month: str = None, advisor: str = N
         return {"error": str(e)}
 
 
-@app.get("/api/spares/export")
-def export_spares_data(division: str = None, month: str = None, advisor: str = None):
-    try:
-        filtered = spares_df.copy()
+@app.get("/api/labour/export")
+async def export_labour_data(division: str = None, month: str = None, advisor: str = None):
+    return await asyncio.to_thread(build_labour_export, division, month, advisor)
 
-        if not filtered.empty:
-            if division and "RO Number" in filtered.columns:
-                filtered = filtered[filtered["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == division)]
-            if month and "Doc Date" in filtered.columns:
-                filtered = filtered[filtered["Doc Date"].apply(lambda x: get_month_name(x) == month)]
-            if advisor and "Service Advisor" in filtered.columns:
-                filtered = filtered[filtered["Service Advisor"].apply(lambda x: str(x).strip() == advisor)]
 
-        details_df = filtered.copy()
+def build_spares_export(division=None, month=None, advisor=None):
+    try:
+        filtered = filter_rows(spares_df, division, month, advisor)
 
-        month_summary = []
-        total_qty = 0.0
-        total_ndp = 0.0
-        total_selling = 0.0
-        total_mrp = 0.0
+        details_df = filtered.reindex(columns=SPARES_EXPORT_COLUMNS, copy=False)
 
         qty_col = "Final Qty"
         ndp_col = "NDP PRIC*Qty"
         sell_col = "Selling Price/Landed Cost (Total of Issued Qty)"
-        mrp_col = "MRP (Per Qty)"
-
-        for m in FINANCIAL_YEAR_ORDER:
-            if "Doc Date" not in filtered.columns:
-                break
-            m_filtered = filtered[filtered["Doc Date"].apply(lambda x: get_month_name(x) == m)]
-            if not m_filtered.empty:
-                qty = float(m_filtered[qty_col].sum()) if qty_col in m_filtered.columns else 0.0
-                ndp = float(m_filtered[ndp_col].sum()) if ndp_col in m_filtered.columns else 0.0
-                selling = float(m_filtered[sell_col].sum()) if sell_col in m_filtered.columns else 0.0
-                mrp_val = float((m_filtered[qty_col] * m_filtered[mrp_col]).sum()) if (qty_col in m_filtered.columns and mrp_col in m_filtered.columns) else 0.0
-
-                month_summary.append({"Month": m, "Final Qty": qty, "NDP Value": ndp, "Selling Price": selling, "MRP Value": mrp_val})
-                total_qty += qty
-                total_ndp += ndp
-                total_selling += selling
-                total_mrp += mrp_val
-
-        if month_summary:
-            month_summary.append({
-                "Month": "Grand Total",
-                "Final Qty": total_qty,
-                "NDP Value": total_ndp,
-                "Selling Price": total_selling,
-                "MRP Value": total_mrp
-            })
 
-        month_summary_df = pd.DataFrame(month_summary)
-
-        div_summary = []
-        total_div_qty = 0.0
-        total_div_ndp = 0.0
-        total_div_selling = 0.0
-        total_div_mrp = 0.0
-
-        for div in get_spares_divisions():
-            df_div = spares_df.copy()
-            if not df_div.empty and "RO Number" in df_div.columns:
-                df_div = df_div[df_div["RO Number"].apply(lambda x: get_division_from_ro(str(x)) == div)]
-
-            qty = float(df_div[qty_col].sum()) if (not df_div.empty and qty_col in df_div.columns) else 0.0
-            ndp = float(df_div[ndp_col].sum()) if (not df_div.empty and ndp_col in df_div.columns) else 0.0
-            selling = float(df_div[sell_col].sum()) if (not df_div.empty and sell_col in df_div.columns) else 0.0
-            mrp_val = float((df_div[qty_col] * df_div[mrp_col]).sum()) if (not df_div.empty and qty_col in df_div.columns and mrp_col in df_div.columns) else 0.0
-
-            div_summary.append({"Division": div, "Final Qty": qty, "NDP Value": ndp, "Selling Price": selling, "MRP Value": mrp_val})
-            total_div_qty += qty
-            total_div_ndp += ndp
-            total_div_selling += selling
-            total_div_mrp += mrp_val
-
-        if div_summary:
-            div_summary.append({
-                "Division": "Grand Total",
-                "Final Qty": total_div_qty,
-                "NDP Value": total_div_ndp,
-                "Selling Price": total_div_selling,
-                "MRP Value": total_div_mrp
-            })
-
-        div_summary_df = pd.DataFrame(div_summary)
+        month_summary_df = pd.DataFrame()
+        if "_month" in filtered.columns:
+            by_month = filtered.groupby("_month", observed=True)
+            month_summary_df = pd.DataFrame({
+                "Final Qty": by_month[qty_col].sum() if qty_col in filtered.columns else 0.0,
+                "NDP Value": by_month[ndp_col].sum() if ndp_col in filtered.columns else 0.0,
+                "Selling Price": by_month[sell_col].sum() if sell_col in filtered.columns else 0.0,
+                "MRP Value": by_month["_mrp_value"].sum()
+            }, index=by_month.size().index)
+            month_summary_df = append_grand_total(month_summary_df.rename_axis("Month").reset_index(), "Month")
+
+        div_summary_df = pd.DataFrame()
+        if "_division" in spares_df.columns:
+            by_division = spares_df.groupby("_division", observed=True)
+            div_summary_df = pd.DataFrame({
+                "Final Qty": by_division[qty_col].sum() if qty_col in spares_df.columns else 0.0,
+                "NDP Value": by_division[ndp_col].sum() if ndp_col in spares_df.columns else 0.0,
+                "Selling Price": by_division[sell_col].sum() if sell_col in spares_df.columns else 0.0,
+                "MRP Value": by_division["_mrp_value"].sum()
+            }, index=by_division.size().index).drop(index="Unknown", errors="ignore")
+            div_summary_df = append_grand_total(div_summary_df.rename_axis("Division").reset_index(), "Division")
 
         part_desc_df = pd.DataFrame()
         if not filtered.empty and "Part Desc" in filtered.columns:
-            temp = filtered.copy()
-
-            if qty_col in temp.columns:
-                temp[qty_col] = pd.to_numeric(temp[qty_col], errors="coerce").fillna(0.0)
-            else:
-                temp[qty_col] = 0.0
-
-            if ndp_col in temp.columns:
-                temp[ndp_col] = pd.to_numeric(temp[ndp_col], errors="coerce").fillna(0.0)
-            else:
-                temp[ndp_col] = 0.0
-
-            if sell_col in temp.columns:
-                temp[sell_col] = pd.to_numeric(temp[sell_col], errors="coerce").fillna(0.0)
-            else:
-                temp[sell_col] = 0.0
-
-            if mrp_col in temp.columns:
-                temp[mrp_col] = pd.to_numeric(temp[mrp_col], errors="coerce").fillna(0.0)
-            else:
-                temp[mrp_col] = 0.0
-
-            temp["MRP_Value"] = temp[qty_col] * temp[mrp_col]
-
-            g = temp.groupby("Part Desc", as_index=False).agg({
-                qty_col: "sum",
-                ndp_col: "sum",
-                sell_col: "sum",
-                "MRP_Value": "sum"
-            })
+            agg_map = {c: "sum" for c in (qty_col, ndp_col, sell_col, "_mrp_value") if c in filtered.columns}
+            g = filtered.groupby("Part Desc", as_index=False, observed=True).agg(agg_map)
 
             g = g.rename(columns={
                 qty_col: "Spare Count",
                 ndp_col: "NDP Value",
                 sell_col: "Selling Price",
-                "MRP_Value": "MRP Value"
+                "_mrp_value": "MRP Value"
             })
-
-            part_desc_df = g[["Part Desc", "Spare Count", "NDP Value", "Selling Price", "MRP Value"]].copy()
-
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            details_df.to_excel(writer, sheet_name="Complete Details", index=False)
-            month_summary_df.to_excel(writer, sheet_name="Month-wise Summary", index=False)
-            div_summary_df.to_excel(writer, sheet_name="Division Summary", index=False)
-            part_desc_df.to_excel(writer, sheet_name="Part Desc Wise", index=False)
-
-        output.seek(0)
-        filename = f"Spares_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+            for c in ("Spare Count", "NDP Value", "Selling Price"):
+                if c not in g.columns:
+                    g[c] = 0.0
+
+            part_desc_df = g[["Part Desc", "Spare Count", "NDP Value", "Selling Price", "MRP Value"]]
+
+        return excel_file_response("Spares", {
+            "Complete Details": details_df,
+            "Month-wise Summary": month_summary_df,
+            "Division Summary": div_summary_df,
+            "Part Desc Wise": part_desc_df
+        })
     except Exception as e:
         print(f"Error exporting spares data: {e}")
         import traceback
@@ -766,716 +765,120 @@ def export_spares_data(division: str = None, month: str = None, advisor: str = N
         return {"error": str(e)}
 
 
+@app.get("/api/spares/export")
+async def export_spares_data(division: str = None, month: str = None, advisor: str = None):
+    return await asyncio.to_thread(build_spares_export, division, month, advisor)
+
+
 # -------------------- HTML / UI --------------------
+# Page, stylesheet and script bodies are compressed once at import; browsers revalidate the
+# page with If-None-Match and get a bodiless 304, and keep hash-versioned assets forever.
 
-HTML_CONTENT = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Unnati Motors Maxi Care Dashboard</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-
-        :root {
-            --primary: #5b4fa0;
-            --secondary: #7366bd;
-            --accent: #f59e0b;
-            --bg: #ffffff;
-            --text: #1f2937;
-            --border: #e5e7eb;
-            --hover: #f3f4f6;
-        }
-
-        body.dark {
-            --bg: #1f2937;
-            --text: #f3f4f6;
-            --border: #374151;
-            --hover: #374151;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%);
-            color: var(--text);
-            min-height: 100vh;
-        }
-
-        .header {
-            background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%);
-            color: white;
-            padding: 1rem 1.5rem;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 1rem;
-        }
-
-        .header h1 { font-size: 1.5rem; font-weight: 700; }
-
-        .header-buttons {
-            display: flex;
-            gap: 0.8rem;
-            align-items: center;
-            flex-wrap: wrap;
-        }
-
-        .theme-toggle {
-            background: rgba(255,255,255,0.2);
-            border: 2px solid rgba(255,255,255,0.3);
-            color: white;
-            padding: 0.4rem 0.8rem;
-            border-radius: 0.5rem;
-            cursor: pointer;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            font-size: 0.9rem;
-        }
-
-        .theme-toggle:hover { background: rgba(255,255,255,0.3); }
-
-        .export-btn {
-            background: #10b981;
-            border: none;
-            color: white;
-            padding: 0.4rem 1rem;
-            border-radius: 0.5rem;
-            cursor: pointer;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            font-size: 0.9rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .export-btn:hover { background: #059669; transform: translateY(-2px); }
-
-        .export-btn:disabled {
-            background: #9ca3af;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .container { max-width: 1400px; margin: 0 auto; padding: 1.5rem 1rem; }
-
-        .card-tabs {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1rem;
-            margin-bottom: 1.5rem;
-        }
-
-        .card-tab {
-            background: var(--bg);
-            padding: 1.5rem;
-            border-radius: 0.75rem;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            border: 3px solid transparent;
-            opacity: 0.6;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-
-        .card-tab:hover { transform: translateY(-2px); }
-
-        .card-tab.active {
-            background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%);
-            color: white;
-            border: 3px solid white;
-            opacity: 1;
-            box-shadow: 0 0 25px 5px rgba(91,79,160,0.8), 0 8px 16px rgba(0,0,0,0.3);
-            transform: translateY(-4px);
-        }
-
-        .card-tab label { font-size: 0.8rem; opacity: 0.8; display: block; margin-bottom: 0.4rem; }
-        .card-tab.active label { opacity: 0.9; }
-        .card-tab .title { font-size: 1.5rem; font-weight: 700; }
-
-        .filters-row {
-            background: var(--bg);
-            padding: 1.25rem;
-            border-radius: 0.75rem;
-            margin-bottom: 1.5rem;
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
-            gap: 1rem;
-            align-items: flex-end;
-        }
-
-        .filter-group { display: flex; flex-direction: column; }
-        .filter-group label { margin-bottom: 0.4rem; font-weight: 600; font-size: 0.85rem; }
-
-        .filter-group select {
-            padding: 0.6rem;
-            border: 1px solid var(--border);
-            border-radius: 0.5rem;
-            background: var(--bg);
-            color: var(--text);
-            font-size: 0.95rem;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .filter-group select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(91, 79, 160, 0.1);
-        }
-
-        .clear-btn {
-            background: #ef4444;
-            border: none;
-            color: white;
-            padding: 0.6rem 1.5rem;
-            border-radius: 0.5rem;
-            cursor: pointer;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            font-size: 0.95rem;
-            width: 100%;
-        }
-
-        .clear-btn:hover {
-            background: #dc2626;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(239,68,68,0.3);
-        }
-
-        .clear-btn:active { transform: translateY(0); }
-
-        .summary-cards {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 1rem;
-            margin-bottom: 1.5rem;
-        }
-
-        .summary-card {
-            background: var(--bg);
-            padding: 1.25rem;
-            border-radius: 0.75rem;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }
-
-        .summary-card label { font-size: 0.8rem; opacity: 0.7; display: block; margin-bottom: 0.4rem; }
-        .summary-card .value { font-size: 1.3rem; font-weight: 700; color: var(--primary); word-break: break-word; }
-
-        .table-section {
-            background: var(--bg);
-            padding: 1.25rem;
-            border-radius: 0.75rem;
-            overflow-x: auto;
-        }
-
-        .table-header {
-            margin-bottom: 1rem;
-            padding-bottom: 0.75rem;
-            border-bottom: 2px solid var(--border);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 1rem;
-        }
-
-        .table-header h2 { font-size: 1.2rem; color: var(--primary); }
-
-        table { width: 100%; border-collapse: collapse; font-size: 0.95rem; }
-        table thead { background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%); color: white; }
-        table th { padding: 0.75rem; text-align: left; font-weight: 600; white-space: nowrap; font-size: 0.9rem; }
-
-        table tbody tr { border-bottom: 1px solid var(--border); transition: background-color 0.2s ease; }
-        table tbody tr:hover { background: var(--hover); }
-        table td { padding: 0.75rem; text-align: left; }
-
-        .number { font-weight: 600; color: #10b981; text-align: center; }
-        .currency { color: var(--accent); font-weight: 600; text-align: right; }
-
-        .empty { text-align: center; padding: 2rem; color: #999; }
-
-        .loading { text-align: center; padding: 1.5rem; }
-        .spinner {
-            border: 4px solid var(--border);
-            border-top: 4px solid var(--primary);
-            border-radius: 50%;
-            width: 40px; height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto;
-        }
-
-        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-
-        @media (max-width: 768px) {
-            .header h1 { font-size: 1.2rem; }
-            .header-buttons { width: 100%; justify-content: flex-start; }
-            .container { padding: 1rem; }
-            .filters-row { grid-template-columns: 1fr; gap: 0.8rem; padding: 1rem; }
-            .card-tabs { grid-template-columns: 1fr; gap: 0.8rem; margin-bottom: 1rem; }
-            .summary-cards { grid-template-columns: 1fr; gap: 0.8rem; margin-bottom: 1rem; }
-            .table-section { padding: 1rem; }
-            .table-header { flex-direction: column; align-items: flex-start; }
-            table { font-size: 0.85rem; }
-            table th, table td { padding: 0.5rem; font-size: 0.8rem; }
-            .summary-card { padding: 1rem; }
-            .summary-card .value { font-size: 1.1rem; }
-            .export-btn { padding: 0.35rem 0.8rem; font-size: 0.8rem; }
-        }
-
-        @media (max-width: 480px) {
-            .header { padding: 0.8rem 1rem; }
-            .header h1 { font-size: 1rem; }
-            .theme-toggle { padding: 0.3rem 0.6rem; font-size: 0.8rem; }
-            .export-btn { padding: 0.3rem 0.6rem; font-size: 0.75rem; }
-            .container { padding: 0.8rem; }
-            table th, table td { padding: 0.4rem; font-size: 0.75rem; }
-            .summary-card .value { font-size: 1rem; }
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Unnati Motors Maxi Care Dashboard</h1>
-        <div class="header-buttons">
-            <button class="export-btn" id="exportBtn" onclick="exportData()">
-                Export to Excel
-            </button>
-            <button class="theme-toggle" id="themeToggle">Dark Mode</button>
-        </div>
-    </div>
-
-    <div class="container">
-        <div class="card-tabs">
-            <div class="card-tab active" id="labour-tab" onclick="switchTab('labour')">
-                <label>Maxi Care Labour</label>
-                <div class="title">Labour</div>
-            </div>
-            <div class="card-tab" id="spares-tab" onclick="switchTab('spares')">
-                <label>Maxi Care Spares</label>
-                <div class="title">Spares</div>
-            </div>
-        </div>
-
-        <div class="filters-row">
-            <div class="filter-group">
-                <label for="division">Division</label>
-                <select id="division">
-                    <option value="">All Divisions</option>
-                </select>
-            </div>
-            <div class="filter-group">
-                <label for="month">Month</label>
-                <select id="month">
-                    <option value="">All Months</option>
-                </select>
-            </div>
-            <div class="filter-group">
-                <label for="advisor">Service Advisor</label>
-                <select id="advisor">
-                    <option value="">All Advisors</option>
-                </select>
-            </div>
-            <div class="filter-group" style="align-self: flex-end;">
-                <button class="clear-btn" onclick="clearAllFilters()">Clear All</button>
-            </div>
-        </div>
-
-        <div class="summary-cards" id="summarySection"></div>
-
-        <div class="table-section">
-            <div class="table-header">
-                <h2 id="tableTitle">Labour Details</h2>
-            </div>
-            <div id="tableContent">
-                <div class="loading"><div class="spinner"></div></div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let currentTab = 'labour';
-        let currentData = [];
-        let currentSummary = {};
-
-        function formatIndian(num) {
-            if (isNaN(num)) return '0';
-            const parts = num.toString().split('.');
-            const intPart = parts[0];
-            const decimalPart = parts[1] ? '.' + parts[1].substring(0, 2) : '';
-
-            let result = '';
-            let count = 0;
-
-            for (let i = intPart.length - 1; i >= 0; i--) {
-                if (count === 3 || (count > 3 && (count - 3) % 2 === 0)) {
-                    result = ',' + result;
-                }
-                result = intPart[i] + result;
-                count++;
-            }
-
-            return result + decimalPart;
-        }
-
-        function clearAllFilters() {
-            document.getElementById('division').value = '';
-            document.getElementById('month').value = '';
-            document.getElementById('advisor').value = '';
-            refreshDependentDropdowns();
-            loadData();
-        }
-
-        function exportData() {
-            const division = document.getElementById('division').value || '';
-            const month = document.getElementById('month').value || '';
-            const advisor = document.getElementById('advisor').value || '';
-
-            const exportBtn = document.getElementById('exportBtn');
-            exportBtn.disabled = true;
-            exportBtn.textContent = 'Exporting...';
-
-            const endpoint = currentTab === 'labour'
-                ? `/api/labour/export?division=${encodeURIComponent(division)}&month=${encodeURIComponent(month)}&advisor=${encodeURIComponent(advisor)}`
-                : `/api/spares/export?division=${encodeURIComponent(division)}&month=${encodeURIComponent(month)}&advisor=${encodeURIComponent(advisor)}`;
-
-            fetch(endpoint)
-                .then(response => response.blob())
-                .then(blob => {
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = currentTab === 'labour'
-                        ? `Labour_Report_${new Date().getTime()}.xlsx`
-                        : `Spares_Report_${new Date().getTime()}.xlsx`;
-                    document.body.appendChild(a);
-                    a.click();
-                    window.URL.revokeObjectURL(url);
-                    document.body.removeChild(a);
-
-                    exportBtn.disabled = false;
-                    exportBtn.textContent = 'Export to Excel';
-                })
-                .catch(error => {
-                    console.error('Export error:', error);
-                    alert('Error exporting data');
-                    exportBtn.disabled = false;
-                    exportBtn.textContent = 'Export to Excel';
-                });
-        }
-
-        const themeToggle = document.getElementById('themeToggle');
-        const isDark = localStorage.getItem('dark') === 'true';
-        if (isDark) {
-            document.body.classList.add('dark');
-            themeToggle.textContent = 'Light Mode';
-        }
-
-        themeToggle.addEventListener('click', () => {
-            document.body.classList.toggle('dark');
-            const newDark = document.body.classList.contains('dark');
-            localStorage.setItem('dark', newDark);
-            themeToggle.textContent = newDark ? 'Light Mode' : 'Dark Mode';
-        });
-
-        function switchTab(tab) {
-            currentTab = tab;
-
-            if (tab === 'labour') {
-                document.getElementById('labour-tab').classList.add('active');
-                document.getElementById('spares-tab').classList.remove('active');
-                document.getElementById('tableTitle').textContent = 'Labour Details';
-            } else {
-                document.getElementById('spares-tab').classList.add('active');
-                document.getElementById('labour-tab').classList.remove('active');
-                document.getElementById('tableTitle').textContent = 'Spare Parts Details';
-            }
-
-            document.getElementById('division').value = '';
-            document.getElementById('month').value = '';
-            document.getElementById('advisor').value = '';
-
-            loadDivisions();
-            refreshDependentDropdowns();
-            loadData();
-        }
-
-        async function loadDivisions() {
-            try {
-                const endpoint = currentTab === 'labour' ? '/api/labour/divisions' : '/api/spares/divisions';
-                const response = await fetch(endpoint);
-                const data = await response.json();
-                const select = document.getElementById('division');
-
-                const current = select.value || '';
-                select.innerHTML = '<option value="">All Divisions</option>';
-                (data.divisions || []).forEach(div => {
-                    const option = document.createElement('option');
-                    option.value = div;
-                    option.textContent = div;
-                    select.appendChild(option);
-                });
-                select.value = current;
-            } catch (error) {
-                console.error('Error loading divisions:', error);
-            }
-        }
-
-        async function loadMonths(division) {
-            try {
-                const monthSelect = document.getElementById('month');
-                const current = monthSelect.value || '';
-
-                monthSelect.innerHTML = '<option value="">All Months</option>';
-
-                const endpoint = currentTab === 'labour'
-                    ? (division ? `/api/labour/months/${encodeURIComponent(division)}` : `/api/labour/months`)
-                    : (division ? `/api/spares/months/${encodeURIComponent(division)}` : `/api/spares/months`);
-
-                const response = await fetch(endpoint);
-                const data = await response.json();
-
-                (data.months || []).forEach(m => {
-                    const option = document.createElement('option');
-                    option.value = m;
-                    option.textContent = m;
-                    monthSelect.appendChild(option);
-                });
-
-                const exists = [...monthSelect.options].some(o => o.value === current);
-                monthSelect.value = exists ? current : '';
-            } catch (error) {
-                console.error('Error loading months:', error);
-            }
-        }
-
-        async function loadAdvisors(division, month) {
-            try {
-                const advisorSelect = document.getElementById('advisor');
-                const current = advisorSelect.value || '';
-
-                advisorSelect.innerHTML = '<option value="">All Advisors</option>';
-
-                const params = new URLSearchParams();
-                if (division) params.append('division', division);
-                if (month) params.append('month', month);
-
-                const endpoint = currentTab === 'labour'
-                    ? `/api/labour/advisors?${params.toString()}`
-                    : `/api/spares/advisors?${params.toString()}`;
-
-                const response = await fetch(endpoint);
-                const data = await response.json();
-
-                (data.advisors || []).forEach(a => {
-                    const option = document.createElement('option');
-                    option.value = a;
-                    option.textContent = a;
-                    advisorSelect.appendChild(option);
-                });
-
-                const exists = [...advisorSelect.options].some(o => o.value === current);
-                advisorSelect.value = exists ? current : '';
-            } catch (error) {
-                console.error('Error loading advisors:', error);
-            }
-        }
-
-        async function refreshDependentDropdowns() {
-            const division = document.getElementById('division').value || null;
-            const month = document.getElementById('month').value || null;
-
-            await loadMonths(division);
-
-            const finalMonth = document.getElementById('month').value || null;
-            await loadAdvisors(division, finalMonth);
-        }
-
-        async function loadData() {
-            const division = document.getElementById('division').value || null;
-            const month = document.getElementById('month').value || null;
-            const advisor = document.getElementById('advisor').value || null;
-
-            const content = document.getElementById('tableContent');
-            const summarySection = document.getElementById('summarySection');
-
-            content.innerHTML = '<div class="loading"><div class="spinner"></div></div>';
-
-            try {
-                const params = new URLSearchParams();
-                if (division) params.append('division', division);
-                if (month) params.append('month', month);
-                if (advisor) params.append('advisor', advisor);
-
-                const summaryEndpoint = currentTab === 'labour'
-                    ? `/api/labour/summary?${params.toString()}`
-                    : `/api/spares/summary?${params.toString()}`;
-
-                const summaryResponse = await fetch(summaryEndpoint);
-                const summary = await summaryResponse.json();
-                currentSummary = summary;
-
-                const dataEndpoint = currentTab === 'labour'
-                    ? `/api/labour/data?${params.toString()}`
-                    : `/api/spares/data?${params.toString()}`;
-
-                const dataResponse = await fetch(dataEndpoint);
-                const data = await dataResponse.json();
-                currentData = data.rows || [];
-
-                content.innerHTML = '';
-
-                if (!data.rows || data.rows.length === 0) {
-                    summarySection.innerHTML = '';
-                    content.innerHTML = '<div class="empty">No data available</div>';
-                    return;
-                }
-
-                if (currentTab === 'labour') {
-                    summarySection.innerHTML = `
-                        <div class="summary-card">
-                            <label>Total Items</label>
-                            <div class="value">${summary.total_items || 0}</div>
-                        </div>
-                        <div class="summary-card">
-                            <label>Total Without Tax</label>
-                            <div class="value">Rs ${formatIndian(summary.total_dis || 0)}</div>
-                        </div>
-                        <div class="summary-card">
-                            <label>Total With Tax</label>
-                            <div class="value">Rs ${formatIndian(summary.total_amount || 0)}</div>
-                        </div>
-                    `;
-                } else {
-                    summarySection.innerHTML = `
-                        <div class="summary-card">
-                            <label>Total NDP Value</label>
-                            <div class="value">Rs ${formatIndian(summary.total_ndp || 0)}</div>
-                        </div>
-                        <div class="summary-card">
-                            <label>Total Selling Price</label>
-                            <div class="value">Rs ${formatIndian(summary.total_selling || 0)}</div>
-                        </div>
-                        <div class="summary-card">
-                            <label>Total MRP Value</label>
-                            <div class="value">Rs ${formatIndian(summary.total_mrp || 0)}</div>
-                        </div>
-                    `;
-                }
-
-                const tableHTML = currentTab === 'labour'
-                    ? `
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Labour Description</th>
-                                    <th style="text-align: center;">Count</th>
-                                    <th style="text-align: right;">Without Tax</th>
-                                    <th style="text-align: right;">With Tax</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                ${data.rows.map(row => `
-                                    <tr>
-                                        <td>${row['Labour Description']}</td>
-                                        <td class="number">${row.count}</td>
-                                        <td class="currency">Rs ${formatIndian(row['Labour Basic Amount-DIS'])}</td>
-                                        <td class="currency">Rs ${formatIndian(row['Labour Total Amount'])}</td>
-                                    </tr>
-                                `).join('')}
-                                <tr style="background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%); color: white; font-weight: bold; border-top: 2px solid #5b4fa0;">
-                                    <td style="padding: 1rem;">Grand Total</td>
-                                    <td class="number" style="color: white;">
-                                        ${data.rows.reduce((sum, row) => sum + (row.count || 0), 0)}
-                                    </td>
-                                    <td class="currency" style="color: white;">
-                                        Rs ${formatIndian(data.rows.reduce((sum, row) => sum + (row['Labour Basic Amount-DIS'] || 0), 0))}
-                                    </td>
-                                    <td class="currency" style="color: white;">
-                                        Rs ${formatIndian(data.rows.reduce((sum, row) => sum + (row['Labour Total Amount'] || 0), 0))}
-                                    </td>
-                                </tr>
-                            </tbody>
-                        </table>
-                    `
-                    : `
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Part Description</th>
-                                    <th style="text-align: center;">Final Qty</th>
-                                    <th style="text-align: right;">NDP*Qty</th>
-                                    <th style="text-align: right;">Selling Price</th>
-                                    <th style="text-align: right;">MRP*Qty</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                ${data.rows.map(row => `
-                                    <tr>
-                                        <td>${row.part_desc}</td>
-                                        <td class="number">${Math.round(row.final_qty || 0)}</td>
-                                        <td class="currency">Rs ${formatIndian(row.ndp_price_qty || 0)}</td>
-                                        <td class="currency">Rs ${formatIndian(row.selling_price_total || 0)}</td>
-                                        <td class="currency">Rs ${formatIndian(row.mrp_total || 0)}</td>
-                                    </tr>
-                                `).join('')}
-                                <tr style="background: linear-gradient(135deg, #5b4fa0 0%, #7366bd 100%); color: white; font-weight: bold; border-top: 2px solid #5b4fa0;">
-                                    <td style="padding: 1rem;">Grand Total</td>
-                                    <td class="number" style="color: white;">
-                                        ${Math.round(data.rows.reduce((sum, row) => sum + (row.final_qty || 0), 0))}
-                                    </td>
-                                    <td class="currency" style="color: white;">
-                                        Rs ${formatIndian(data.rows.reduce((sum, row) => sum + (row.ndp_price_qty || 0), 0))}
-                                    </td>
-                                    <td class="currency" style="color: white;">
-                                        Rs ${formatIndian(data.rows.reduce((sum, row) => sum + (row.selling_price_total || 0), 0))}
-                                    </td>
-                                    <td class="currency" style="color: white;">
-                                        Rs ${formatIndian(data.rows.reduce((sum, row) => sum + (row.mrp_total || 0), 0))}
-                                    </td>
-                                </tr>
-                            </tbody>
-                        </table>
-                    `;
-
-                content.innerHTML = tableHTML;
-
-            } catch (error) {
-                console.error('Error loading data:', error);
-                summarySection.innerHTML = '';
-                content.innerHTML = '<div class="empty">Error loading data</div>';
-            }
-        }
-
-        document.getElementById('division').addEventListener('change', async () => {
-            await refreshDependentDropdowns();
-            loadData();
-        });
-
-        document.getElementById('month').addEventListener('change', async () => {
-            const division = document.getElementById('division').value || null;
-            const month = document.getElementById('month').value || null;
-            await loadAdvisors(division, month);
-            loadData();
-        });
-
-        document.getElementById('advisor').addEventListener('change', () => {
-            loadData();
-        });
-
-        loadDivisions();
-        refreshDependentDropdowns();
-        loadData();
-    </script>
-</body>
-</html>
-"""
+HTML_CACHE_CONTROL = "public, max-age=300"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# For a version this instance didn't build (another instance mid-deploy, or a rollback),
+# so the body must not be pinned under that URL
+OTHER_VERSION_CACHE_CONTROL = "no-cache"
+
+
+def compressed_variants(body):
+    # Content coding -> (body, ETag); every coding gets its own strong ETag
+    digest = hashlib.md5(body).hexdigest()
+    return {
+        "br": (brotli.compress(body, quality=11), f'"{digest}-br"'),
+        "gzip": (gzip.compress(body, compresslevel=9), f'"{digest}-gzip"'),
+        "identity": (body, f'"{digest}"'),
+    }
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def accepted_encodings(header):
+    # Content coding -> q-value; a coding with q=0 is refused
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def preferred_encoding(request):
+    accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+    wildcard = accepted.get("*", 0.0)
+    # Highest q wins; on a tie Brotli beats gzip
+    best, best_q = "identity", 0.0
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def cached_response(request, variants, media_type, cache_control):
+    encoding = preferred_encoding(request)
+    body, etag = variants[encoding]
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=headers)
+
+
+# The page, stylesheet and script live in static/ and are read once at import;
+# editing them needs a restart but no Python change.
+STATIC_DIR = BASE_DIR / "static"
+
+DASHBOARD_CSS_BYTES = (STATIC_DIR / "dashboard.css").read_bytes()
+DASHBOARD_CSS_HASH = hashlib.sha1(DASHBOARD_CSS_BYTES).hexdigest()[:10]
+DASHBOARD_CSS_URL = f"/static/dashboard.css.{DASHBOARD_CSS_HASH}"
+DASHBOARD_CSS_VARIANTS = compressed_variants(DASHBOARD_CSS_BYTES)
+
+DASHBOARD_JS_BYTES = (STATIC_DIR / "dashboard.js").read_bytes()
+DASHBOARD_JS_HASH = hashlib.sha1(DASHBOARD_JS_BYTES).hexdigest()[:10]
+DASHBOARD_JS_URL = f"/static/dashboard.js?v={DASHBOARD_JS_HASH}"
+DASHBOARD_JS_VARIANTS = compressed_variants(DASHBOARD_JS_BYTES)
+
+HTML_BYTES = (
+    (STATIC_DIR / "dashboard.html").read_text(encoding="utf-8")
+    .replace("{DASHBOARD_CSS_URL}", DASHBOARD_CSS_URL)
+    .replace("{DASHBOARD_JS_URL}", DASHBOARD_JS_URL)
+    .encode("utf-8")
+)
+HTML_VARIANTS = compressed_variants(HTML_BYTES)
 
 
 @app.get("/", response_class=HTMLResponse)
-def serve_dashboard():
-    return HTML_CONTENT
+async def serve_dashboard(request: Request):
+    return cached_response(request, HTML_VARIANTS, "text/html", HTML_CACHE_CONTROL)
+
+
+# Any version is answered with the current stylesheet, so a page cached from before a deploy still gets styled;
+# only the current version is cacheable forever
+@app.get("/static/dashboard.css.{version}")
+async def serve_dashboard_css(request: Request, version: str):
+    cache_control = ASSET_CACHE_CONTROL if version == DASHBOARD_CSS_HASH else OTHER_VERSION_CACHE_CONTROL
+    return cached_response(request, DASHBOARD_CSS_VARIANTS, "text/css", cache_control)
+
+
+@app.get("/static/dashboard.js")
+async def serve_dashboard_js(request: Request, v: str = None):
+    cache_control = ASSET_CACHE_CONTROL if v == DASHBOARD_JS_HASH else OTHER_VERSION_CACHE_CONTROL
+    return cached_response(request, DASHBOARD_JS_VARIANTS, "text/javascript", cache_control)
 
 
 @app.on_event("startup")
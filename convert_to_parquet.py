@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BASE_DIR = Path(__file__).parent
+
+# Schema metadata key mapping each column that mixes numbers and text to the columns holding its numbers
+MIXED_COLUMNS_KEY = b"maxi_care:mixed_columns"
+
+CONVERSIONS = [
+    (
+        Path(os.getenv("LABOUR_EXCEL", str(BASE_DIR / "Maxi Labour.xlsx"))),
+        Path(os.getenv("LABOUR_PARQUET", str(BASE_DIR / "maxi_labour.parquet"))),
+    ),
+    (
+        Path(os.getenv("SPARES_EXCEL", str(BASE_DIR / "Maxi Spares.xlsx"))),
+        Path(os.getenv("SPARES_PARQUET", str(BASE_DIR / "maxi_spares.parquet"))),
+    ),
+]
+
+
+def is_integer(value):
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def is_float(value):
+    return isinstance(value, (float, np.floating)) and not pd.isna(value)
+
+
+def split_mixed_column(values):
+    # Integer and float cells move to parallel typed columns and the rest stay as text;
+    # every cell lives in exactly one of the three and is null in the other two
+    integers = values.map(is_integer).astype(bool)
+    floats = values.map(is_float).astype(bool)
+    text = values.where(~integers & ~floats & values.notna())
+    return (
+        text.map(lambda v: v if pd.isna(v) else str(v)).astype("string"),
+        values.where(integers).astype("Int64"),
+        values.where(floats).astype("float64"),
+    )
+
+
+def read_workbook(source):
+    df = pd.read_excel(source, engine="calamine")
+
+    # Arrow needs one type per column, so a column mixing numbers and text is split up;
+    # the schema metadata names the number columns so the app can put each cell back exactly
+    mixed_columns = {}
+    for c in df.select_dtypes("object").columns:
+        if pd.api.types.infer_dtype(df[c], skipna=True) in ("mixed", "mixed-integer"):
+            spec = {"integers": f"_integers:{c}", "floats": f"_floats:{c}"}
+            df[c], df[spec["integers"]], df[spec["floats"]] = split_mixed_column(df[c])
+            mixed_columns[c] = spec
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), MIXED_COLUMNS_KEY: json.dumps(mixed_columns).encode("utf-8")}
+    return table.replace_schema_metadata(metadata)
+
+
+def convert(source, target):
+    table = read_workbook(source)
+    pq.write_table(table, target, compression="zstd")
+    return table.num_rows
+
+
+def main():
+    for source, target in CONVERSIONS:
+        if not source.exists():
+            print(f"ERROR: {source} not found")
+            return 1
+        print(f"Converting {source} -> {target}")
+        print(f"   Wrote {convert(source, target)} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from convert_to_parquet import BASE_DIR, read_workbook
+
+# (Excel source, Parquet copy, Arrow IPC file memory-mapped by the app).
+# The targets default to the app's own defaults (the workbooks), so this only writes
+# anything when LABOUR_FILE/SPARES_FILE point at .arrow files, as in render.yaml.
+SOURCES = [
+    (
+        Path(os.getenv("LABOUR_EXCEL", str(BASE_DIR / "Maxi Labour.xlsx"))),
+        Path(os.getenv("LABOUR_PARQUET", str(BASE_DIR / "maxi_labour.parquet"))),
+        Path(os.getenv("LABOUR_FILE", str(BASE_DIR / "Maxi Labour.xlsx"))),
+    ),
+    (
+        Path(os.getenv("SPARES_EXCEL", str(BASE_DIR / "Maxi Spares.xlsx"))),
+        Path(os.getenv("SPARES_PARQUET", str(BASE_DIR / "maxi_spares.parquet"))),
+        Path(os.getenv("SPARES_FILE", str(BASE_DIR / "Maxi Spares.xlsx"))),
+    ),
+]
+
+
+def is_stale(target, sources):
+    if not target.exists():
+        return True
+    built = target.stat().st_mtime
+    return any(source.exists() and source.stat().st_mtime > built for source in sources)
+
+
+def write_arrow(excel, parquet, target):
+    if parquet.exists():
+        table = pq.read_table(parquet)
+    else:
+        table = read_workbook(excel)
+
+    # Written beside the target and renamed over it once complete, so an interrupted run
+    # never leaves a truncated file that looks newer than its sources
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return table.num_rows
+
+
+def main():
+    for excel, parquet, target in SOURCES:
+        if target.suffix.lower() != ".arrow":
+            print(f"Skipping {target}: not an .arrow file")
+            continue
+        if not is_stale(target, (parquet, excel)):
+            print(f"Using existing {target}")
+            continue
+        if not parquet.exists() and not excel.exists():
+            print(f"ERROR: neither {parquet} nor {excel} found")
+            return 1
+        print(f"Writing {target}")
+        print(f"   Wrote {write_arrow(excel, parquet, target)} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
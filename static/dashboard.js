@@ -0,0 +1,566 @@
+let currentTab = 'labour';
+let currentData = [];
+let currentSummary = {};
+
+// Only the rows inside the scroll viewport (plus some overscan) are in the DOM
+const ROW_HEIGHT = 45;
+const ROW_OVERSCAN = 10;
+let windowStart = -1;
+let windowEnd = -1;
+let scrollFrame = 0;
+let renderFrame = 0;
+
+const INR_FORMAT = new Intl.NumberFormat('en-IN', { minimumFractionDigits: 0, maximumFractionDigits: 2 });
+const FORMAT_CACHE_LIMIT = 10000;
+const formatCache = new Map();
+
+function formatIndian(num) {
+    const key = +num;
+    if (!isFinite(key)) return '0';
+
+    let formatted = formatCache.get(key);
+    if (formatted === undefined) {
+        if (formatCache.size >= FORMAT_CACHE_LIMIT) formatCache.clear();
+        formatted = INR_FORMAT.format(key);
+        formatCache.set(key, formatted);
+    }
+    return formatted;
+}
+
+// Starting a request of a given kind aborts the previous one, so a slow stale
+// response can never overwrite a newer one
+const pendingRequests = {};
+
+function restartRequest(kind) {
+    if (pendingRequests[kind]) pendingRequests[kind].abort();
+    pendingRequests[kind] = new AbortController();
+    return pendingRequests[kind].signal;
+}
+
+function isAbort(error) {
+    return error.name === 'AbortError';
+}
+
+// Runs immediately when idle; calls arriving within `wait` ms collapse into one trailing run
+function debounce(fn, wait) {
+    let timer = null;
+    let pending = false;
+    return function () {
+        if (timer === null) {
+            fn();
+        } else {
+            pending = true;
+            clearTimeout(timer);
+        }
+        timer = setTimeout(() => {
+            timer = null;
+            if (pending) {
+                pending = false;
+                fn();
+            }
+        }, wait);
+    };
+}
+
+function clearAllFilters() {
+    document.getElementById('division').value = '';
+    document.getElementById('month').value = '';
+    document.getElementById('advisor').value = '';
+    refreshDependentDropdowns();
+    loadData();
+}
+
+function exportData() {
+    const division = document.getElementById('division').value || '';
+    const month = document.getElementById('month').value || '';
+    const advisor = document.getElementById('advisor').value || '';
+
+    const exportBtn = document.getElementById('exportBtn');
+    exportBtn.disabled = true;
+    exportBtn.textContent = 'Exporting...';
+
+    const endpoint = currentTab === 'labour'
+        ? `/api/labour/export?division=${encodeURIComponent(division)}&month=${encodeURIComponent(month)}&advisor=${encodeURIComponent(advisor)}`
+        : `/api/spares/export?division=${encodeURIComponent(division)}&month=${encodeURIComponent(month)}&advisor=${encodeURIComponent(advisor)}`;
+
+    fetch(endpoint)
+        .then(response => response.blob())
+        .then(blob => {
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = currentTab === 'labour'
+                ? `Labour_Report_${new Date().getTime()}.xlsx`
+                : `Spares_Report_${new Date().getTime()}.xlsx`;
+            document.body.appendChild(a);
+            a.click();
+            window.URL.revokeObjectURL(url);
+            document.body.removeChild(a);
+
+            exportBtn.disabled = false;
+            exportBtn.textContent = 'Export to Excel';
+        })
+        .catch(error => {
+            console.error('Export error:', error);
+            alert('Error exporting data');
+            exportBtn.disabled = false;
+            exportBtn.textContent = 'Export to Excel';
+        });
+}
+
+const themeToggle = document.getElementById('themeToggle');
+const isDark = localStorage.getItem('dark') === 'true';
+if (isDark) {
+    document.body.classList.add('dark');
+    themeToggle.textContent = 'Light Mode';
+}
+
+themeToggle.addEventListener('click', () => {
+    document.body.classList.toggle('dark');
+    const newDark = document.body.classList.contains('dark');
+    localStorage.setItem('dark', newDark);
+    themeToggle.textContent = newDark ? 'Light Mode' : 'Dark Mode';
+});
+
+function switchTab(tab) {
+    currentTab = tab;
+
+    if (tab === 'labour') {
+        document.getElementById('labour-tab').classList.add('active');
+        document.getElementById('spares-tab').classList.remove('active');
+        document.getElementById('tableTitle').textContent = 'Labour Details';
+    } else {
+        document.getElementById('spares-tab').classList.add('active');
+        document.getElementById('labour-tab').classList.remove('active');
+        document.getElementById('tableTitle').textContent = 'Spare Parts Details';
+    }
+
+    document.getElementById('division').value = '';
+    document.getElementById('month').value = '';
+    document.getElementById('advisor').value = '';
+
+    // Rows, their formatted cells and any render still waiting for a frame belong to the previous tab
+    cancelAnimationFrame(renderFrame);
+    currentData = [];
+    rowCache = new Map();
+
+    renderSummarySkeleton();
+    refilter();
+}
+
+// Used with all filters cleared, so the month and advisor lists don't depend on each other and
+// every list can be fetched alongside the table data
+function refilter() {
+    const signal = restartRequest('dropdowns');
+    loadData();
+    return Promise.all([loadDivisions(), loadMonths(null, signal), loadAdvisors(null, null, signal)]);
+}
+
+// Option lists only depend on the URL (tab + parent filters) and the server data is loaded
+// once, so each list is fetched at most once per page. Requests are shared rather than
+// aborted; a superseded caller just ignores the result.
+const dropdownCache = new Map();
+
+function fetchDropdown(endpoint) {
+    let request = dropdownCache.get(endpoint);
+    if (!request) {
+        request = fetch(endpoint).then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return response.json();
+        });
+        request.catch(() => dropdownCache.delete(endpoint));
+        dropdownCache.set(endpoint, request);
+    }
+    return request;
+}
+
+function fillSelect(select, allLabel, values) {
+    const current = select.value || '';
+    const fragment = document.createDocumentFragment();
+    const allOption = document.createElement('option');
+    allOption.value = '';
+    allOption.textContent = allLabel;
+    fragment.appendChild(allOption);
+    for (const value of values) {
+        const option = document.createElement('option');
+        option.value = value;
+        option.textContent = value;
+        fragment.appendChild(option);
+    }
+    select.replaceChildren(fragment);
+    select.value = values.includes(current) ? current : '';
+}
+
+async function loadDivisions() {
+    try {
+        const signal = restartRequest('divisions');
+        const endpoint = currentTab === 'labour' ? '/api/labour/divisions' : '/api/spares/divisions';
+        const data = await fetchDropdown(endpoint);
+        if (signal.aborted) return;
+        fillSelect(document.getElementById('division'), 'All Divisions', data.divisions || []);
+    } catch (error) {
+        console.error('Error loading divisions:', error);
+    }
+}
+
+async function loadMonths(division, signal) {
+    try {
+        const endpoint = currentTab === 'labour'
+            ? (division ? `/api/labour/months/${encodeURIComponent(division)}` : `/api/labour/months`)
+            : (division ? `/api/spares/months/${encodeURIComponent(division)}` : `/api/spares/months`);
+
+        const data = await fetchDropdown(endpoint);
+        if (signal.aborted) return;
+
+        fillSelect(document.getElementById('month'), 'All Months', data.months || []);
+    } catch (error) {
+        console.error('Error loading months:', error);
+    }
+}
+
+async function loadAdvisors(division, month, signal) {
+    try {
+        const params = new URLSearchParams();
+        if (division) params.append('division', division);
+        if (month) params.append('month', month);
+
+        const endpoint = currentTab === 'labour'
+            ? `/api/labour/advisors?${params.toString()}`
+            : `/api/spares/advisors?${params.toString()}`;
+
+        const data = await fetchDropdown(endpoint);
+        if (signal.aborted) return;
+
+        fillSelect(document.getElementById('advisor'), 'All Advisors', data.advisors || []);
+    } catch (error) {
+        console.error('Error loading advisors:', error);
+    }
+}
+
+async function refreshDependentDropdowns() {
+    const division = document.getElementById('division').value || null;
+    const month = document.getElementById('month').value || null;
+
+    const signal = restartRequest('dropdowns');
+    await loadMonths(division, signal);
+    if (signal.aborted) return;
+
+    const finalMonth = document.getElementById('month').value || null;
+    await loadAdvisors(division, finalMonth, signal);
+}
+
+const labourRowTemplate = document.getElementById('labour-row').content.firstElementChild;
+const sparesRowTemplate = document.getElementById('spares-row').content.firstElementChild;
+
+function labourCells(row) {
+    return [
+        row['Labour Description'] ?? '',
+        row.count,
+        'Rs ' + formatIndian(row['Labour Basic Amount-DIS']),
+        'Rs ' + formatIndian(row['Labour Total Amount'])
+    ];
+}
+
+function sparesCells(row) {
+    return [
+        row.part_desc ?? '',
+        Math.round(row.final_qty || 0),
+        'Rs ' + formatIndian(row.ndp_price_qty || 0),
+        'Rs ' + formatIndian(row.selling_price_total || 0),
+        'Rs ' + formatIndian(row.mrp_total || 0)
+    ];
+}
+
+// Cell strings are formatted once when a dataset arrives; scrolling and re-renders only read them
+function prepareRows(rows, cellValues) {
+    for (let i = 0; i < rows.length; i++) rows[i]._cells = cellValues(rows[i]);
+}
+
+// Rows in the current window, keyed by tab + description, with the values last written to each cell.
+// A row that stays in view across a scroll or a filter change keeps its node and only changed cells are touched.
+let rowCache = new Map();
+
+// Every cell is written through textContent, so descriptions are never parsed as HTML
+function buildRow(row, template, nextCache) {
+    const values = row._cells;
+    const key = currentTab + '|' + values[0];
+    let entry = rowCache.get(key);
+    if (!entry) entry = { tr: template.cloneNode(true), values: [] };
+
+    const cells = entry.tr.children;
+    for (let i = 0; i < values.length; i++) {
+        if (entry.values[i] !== values[i]) {
+            cells[i].textContent = values[i];
+            entry.values[i] = values[i];
+        }
+    }
+    nextCache.set(key, entry);
+    return entry.tr;
+}
+
+function computeTotals(rows, keys) {
+    const totals = {};
+    for (const key of keys) totals[key] = 0;
+    for (let i = 0; i < rows.length; i++) {
+        const row = rows[i];
+        for (const key of keys) totals[key] += row[key] || 0;
+    }
+    return totals;
+}
+
+function buildSpacerRow(height, columns) {
+    const tr = document.createElement('tr');
+    tr.className = 'spacer';
+    tr.style.height = height + 'px';
+    const td = document.createElement('td');
+    td.colSpan = columns;
+    tr.appendChild(td);
+    return tr;
+}
+
+function renderRowWindow() {
+    const scroller = document.querySelector('#tableContent .table-scroll');
+    if (!scroller) return;
+
+    // The scroller only grows to fit its rows, so size the window by the page viewport (its upper bound)
+    const start = Math.max(0, Math.floor(scroller.scrollTop / ROW_HEIGHT) - ROW_OVERSCAN);
+    const end = Math.min(currentData.length, Math.ceil((scroller.scrollTop + window.innerHeight) / ROW_HEIGHT) + ROW_OVERSCAN);
+    if (start === windowStart && end === windowEnd) return;
+    windowStart = start;
+    windowEnd = end;
+
+    const template = currentTab === 'labour' ? labourRowTemplate : sparesRowTemplate;
+    const columns = currentTab === 'labour' ? 4 : 5;
+    const nextCache = new Map();
+    const fragment = document.createDocumentFragment();
+    if (start > 0) fragment.appendChild(buildSpacerRow(start * ROW_HEIGHT, columns));
+    for (let i = start; i < end; i++) fragment.appendChild(buildRow(currentData[i], template, nextCache));
+    if (end < currentData.length) fragment.appendChild(buildSpacerRow((currentData.length - end) * ROW_HEIGHT, columns));
+    scroller.querySelector('tbody').replaceChildren(fragment);
+    rowCache = nextCache;
+}
+
+function onTableScroll() {
+    if (scrollFrame) return;
+    scrollFrame = requestAnimationFrame(() => {
+        scrollFrame = 0;
+        renderRowWindow();
+    });
+}
+
+// Card layout is rendered once per tab; reloads only rewrite the values
+function renderSummarySkeleton() {
+    document.getElementById('summarySection').innerHTML = currentTab === 'labour'
+        ? `
+            <div class="summary-card">
+                <label>Total Items</label>
+                <div class="value" id="sumItems">&mdash;</div>
+            </div>
+            <div class="summary-card">
+                <label>Total Without Tax</label>
+                <div class="value" id="sumDis">&mdash;</div>
+            </div>
+            <div class="summary-card">
+                <label>Total With Tax</label>
+                <div class="value" id="sumAmount">&mdash;</div>
+            </div>
+        `
+        : `
+            <div class="summary-card">
+                <label>Total NDP Value</label>
+                <div class="value" id="sumNdp">&mdash;</div>
+            </div>
+            <div class="summary-card">
+                <label>Total Selling Price</label>
+                <div class="value" id="sumSelling">&mdash;</div>
+            </div>
+            <div class="summary-card">
+                <label>Total MRP Value</label>
+                <div class="value" id="sumMrp">&mdash;</div>
+            </div>
+        `;
+}
+
+function updateSummary(summary) {
+    if (currentTab === 'labour') {
+        document.getElementById('sumItems').textContent = summary.total_items || 0;
+        document.getElementById('sumDis').textContent = 'Rs ' + formatIndian(summary.total_dis || 0);
+        document.getElementById('sumAmount').textContent = 'Rs ' + formatIndian(summary.total_amount || 0);
+    } else {
+        document.getElementById('sumNdp').textContent = 'Rs ' + formatIndian(summary.total_ndp || 0);
+        document.getElementById('sumSelling').textContent = 'Rs ' + formatIndian(summary.total_selling || 0);
+        document.getElementById('sumMrp').textContent = 'Rs ' + formatIndian(summary.total_mrp || 0);
+    }
+}
+
+// Summary cards and table are written together in one animation frame, so a load costs a single layout pass
+
+function scheduleRender(tab, render) {
+    cancelAnimationFrame(renderFrame);
+    renderFrame = requestAnimationFrame(() => {
+        renderFrame = 0;
+        if (tab === currentTab) render();
+    });
+}
+
+async function refreshData() {
+    const tab = currentTab;
+    const division = document.getElementById('division').value || null;
+    const month = document.getElementById('month').value || null;
+    const advisor = document.getElementById('advisor').value || null;
+
+    const content = document.getElementById('tableContent');
+    const summarySection = document.getElementById('summarySection');
+
+    cancelAnimationFrame(renderFrame);
+    content.innerHTML = '<div class="loading"><div class="spinner"></div></div>';
+
+    const signal = restartRequest('data');
+    try {
+        const params = new URLSearchParams();
+        if (division) params.append('division', division);
+        if (month) params.append('month', month);
+        if (advisor) params.append('advisor', advisor);
+
+        const summaryEndpoint = currentTab === 'labour'
+            ? `/api/labour/summary?${params.toString()}`
+            : `/api/spares/summary?${params.toString()}`;
+
+        const dataEndpoint = currentTab === 'labour'
+            ? `/api/labour/data?${params.toString()}`
+            : `/api/spares/data?${params.toString()}`;
+
+        const [summary, data] = await Promise.all([
+            fetch(summaryEndpoint, { signal }).then(response => response.json()),
+            fetch(dataEndpoint, { signal }).then(response => response.json())
+        ]);
+        if (tab !== currentTab) return;
+        const rows = data.rows || [];
+        prepareRows(rows, tab === 'labour' ? labourCells : sparesCells);
+
+        if (rows.length === 0) {
+            scheduleRender(tab, () => {
+                currentSummary = summary;
+                currentData = rows;
+                summarySection.hidden = true;
+                content.innerHTML = '<div class="empty">No data available</div>';
+            });
+            return;
+        }
+
+        const totals = currentTab === 'labour'
+            ? computeTotals(rows, ['count', 'Labour Basic Amount-DIS', 'Labour Total Amount'])
+            : computeTotals(rows, ['final_qty', 'ndp_price_qty', 'selling_price_total', 'mrp_total']);
+
+        const tableHTML = currentTab === 'labour'
+            ? `
+                <div class="table-scroll">
+                    <table class="virtual-table">
+                        <thead>
+                            <tr>
+                                <th>Labour Description</th>
+                                <th style="text-align: center;">Count</th>
+                                <th style="text-align: right;">Without Tax</th>
+                                <th style="text-align: right;">With Tax</th>
+                            </tr>
+                        </thead>
+                        <tbody></tbody>
+                        <tfoot>
+                            <tr class="grand-total">
+                                <td style="padding: 1rem;">Grand Total</td>
+                                <td class="number" style="color: white;">
+                                    ${totals.count}
+                                </td>
+                                <td class="currency" style="color: white;">
+                                    Rs ${formatIndian(totals['Labour Basic Amount-DIS'])}
+                                </td>
+                                <td class="currency" style="color: white;">
+                                    Rs ${formatIndian(totals['Labour Total Amount'])}
+                                </td>
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+            `
+            : `
+                <div class="table-scroll">
+                    <table class="virtual-table">
+                        <thead>
+                            <tr>
+                                <th>Part Description</th>
+                                <th style="text-align: center;">Final Qty</th>
+                                <th style="text-align: right;">NDP*Qty</th>
+                                <th style="text-align: right;">Selling Price</th>
+                                <th style="text-align: right;">MRP*Qty</th>
+                            </tr>
+                        </thead>
+                        <tbody></tbody>
+                        <tfoot>
+                            <tr class="grand-total">
+                                <td style="padding: 1rem;">Grand Total</td>
+                                <td class="number" style="color: white;">
+                                    ${Math.round(totals.final_qty)}
+                                </td>
+                                <td class="currency" style="color: white;">
+                                    Rs ${formatIndian(totals.ndp_price_qty)}
+                                </td>
+                                <td class="currency" style="color: white;">
+                                    Rs ${formatIndian(totals.selling_price_total)}
+                                </td>
+                                <td class="currency" style="color: white;">
+                                    Rs ${formatIndian(totals.mrp_total)}
+                                </td>
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+            `;
+
+        scheduleRender(tab, () => {
+            currentSummary = summary;
+            currentData = rows;
+            summarySection.hidden = false;
+            updateSummary(summary);
+            content.innerHTML = tableHTML;
+            windowStart = windowEnd = -1;
+            content.querySelector('.table-scroll').addEventListener('scroll', onTableScroll, { passive: true });
+            renderRowWindow();
+        });
+
+    } catch (error) {
+        if (isAbort(error)) return;
+        console.error('Error loading data:', error);
+        summarySection.hidden = true;
+        content.innerHTML = '<div class="empty">Error loading data</div>';
+    }
+}
+
+const LOAD_DATA_DEBOUNCE_MS = 120;
+const loadData = debounce(refreshData, LOAD_DATA_DEBOUNCE_MS);
+
+window.addEventListener('resize', onTableScroll);
+
+async function onDivisionChange() {
+    await refreshDependentDropdowns();
+    loadData();
+}
+
+async function onMonthChange() {
+    const division = document.getElementById('division').value || null;
+    const month = document.getElementById('month').value || null;
+    await loadAdvisors(division, month, restartRequest('dropdowns'));
+    loadData();
+}
+
+function onAdvisorChange() {
+    loadData();
+}
+
+document.querySelector('.filters-row').addEventListener('change', event => {
+    if (event.target.id === 'division') return onDivisionChange();
+    if (event.target.id === 'month') return onMonthChange();
+    if (event.target.id === 'advisor') return onAdvisorChange();
+});
+
+renderSummarySkeleton();
+refilter();